@@ -0,0 +1,22 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Check a token against ADMIN_TOKEN. Always False when ADMIN_TOKEN is unset."""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token or not token:
+        return False
+    return secrets.compare_digest(token, admin_token)
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject requests that don't carry a valid X-Admin-Token header."""
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=403,
+            detail="Admin token required"
+        )
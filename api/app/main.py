@@ -4,7 +4,7 @@ load_dotenv()
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import health, extraction, extraction_v2
+from app.routers import health, extraction, extraction_v2, admin
 
 app = FastAPI(
     title="Insurinz API",
@@ -25,6 +25,7 @@ app.add_middleware(
 app.include_router(health.router, tags=["Health"])
 app.include_router(extraction.router, prefix="/api/v1", tags=["Extraction v1 (Mock)"])
 app.include_router(extraction_v2.router, prefix="/api/v2", tags=["Extraction v2 (OCR)"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
 
 @app.get("/")
@@ -34,6 +35,7 @@ async def root():
         "version": "2.0.0",
         "endpoints": {
             "v1": "/api/v1/extract - Mock extraction (for testing)",
-            "v2": "/api/v2/extract - OCR extraction (pytesseract)"
+            "v2": "/api/v2/extract - OCR extraction (pytesseract)",
+            "admin": "/admin/profiles - Recent request profiles"
         }
     }
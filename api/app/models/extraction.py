@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Literal
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -10,6 +10,7 @@ class ExtractedField(BaseModel):
 
 
 class ExtractionResponse(BaseModel):
+    document_id: Optional[str] = None
     filename: str
     document_type: Literal["policy", "claim", "submission", "unknown"]
     confidence: float
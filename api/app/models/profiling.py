@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List
+from datetime import datetime
+
+
+class ProfiledCall(BaseModel):
+    name: str
+    duration_ms: float
+
+
+class ProfileSummary(BaseModel):
+    request_id: str
+    captured_at: datetime
+    duration_ms: float
+    metadata: Dict[str, Any]
+    calls: List[ProfiledCall]
+    profile_file: str
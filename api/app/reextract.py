@@ -0,0 +1,101 @@
+"""
+Bulk re-extraction of stored OCR text.
+
+Re-runs document classification and field parsing over documents whose
+OCR text was kept by the v2 extraction endpoint, using the current rules.
+No OCR is performed, so backfills are bounded by CPU rather than Tesseract.
+
+Usage:
+    python -m app.reextract --all --output results.jsonl
+    python -m app.reextract <document_id> [<document_id> ...]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.services.ocr_extraction_service import OCRExtractionService
+from app.services.ocr_text_store import OCRTextStore
+
+_worker_service: Optional[OCRExtractionService] = None
+
+
+def _init_worker(store_dir: str) -> None:
+    """Create one service per worker process instead of one per document."""
+    global _worker_service
+    _worker_service = OCRExtractionService(text_store=OCRTextStore(store_dir))
+
+
+def _reextract(document_id: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Re-extract a single document, returning its id, JSON result and error.
+    Errors are returned rather than raised so one corrupt document can't
+    abort the whole backfill.
+    """
+    try:
+        result = _worker_service.reextract_stored(document_id)
+    except Exception as e:
+        return document_id, None, f"{type(e).__name__}: {e}"
+    return document_id, result.model_dump_json() if result else None, None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Re-parse stored OCR text with the current extraction rules."
+    )
+    parser.add_argument("document_ids", nargs="*", help="Document ids to re-extract")
+    parser.add_argument("--all", action="store_true", help="Re-extract every stored document")
+    parser.add_argument("--store-dir", help="OCR text store directory (default: OCR_TEXT_STORE_DIR)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--chunksize", type=int, default=256, help="Documents per worker task")
+    parser.add_argument("--output", help="Write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.all == bool(args.document_ids):
+        parser.error("pass either --all or one or more document ids")
+
+    store = OCRTextStore(args.store_dir)
+    document_ids = store.iter_ids() if args.all else args.document_ids
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    processed = 0
+    missing = 0
+    failed = 0
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(store.root_dir,)
+        ) as executor:
+            for document_id, result, error in executor.map(
+                _reextract, document_ids, chunksize=args.chunksize
+            ):
+                if error is not None:
+                    print(f"Document failed: {document_id}: {error}", file=sys.stderr)
+                    failed += 1
+                    continue
+                if result is None:
+                    print(f"Document not found: {document_id}", file=sys.stderr)
+                    missing += 1
+                    continue
+                output.write(result + "\n")
+                processed += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(
+        f"Re-extracted {processed} documents ({missing} not found, {failed} failed)",
+        file=sys.stderr
+    )
+    return 1 if missing or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
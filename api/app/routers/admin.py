@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List
+
+from app.dependencies import require_admin
+from app.models.profiling import ProfileSummary
+from app.services.profiling import profiler
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+async def list_profiles(limit: int = Query(20, ge=1, le=200)):
+    """
+    List the most recent request profiles, newest first.
+
+    Requires the X-Admin-Token header to match ADMIN_TOKEN. Each entry
+    references a .prof file in PROFILE_DIR that can be inspected with
+    pstats or snakeviz.
+    """
+    return profiler.list_recent(limit)
@@ -1,21 +1,33 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
+import uuid
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException
+from typing import List, Optional
 
 from app.models.extraction import ExtractionResponse
 from app.services.ocr_extraction_service import OCRExtractionService
+from app.dependencies import is_admin_token
+from app.services.profiling import ProfileCapture, profiler
 
 router = APIRouter()
 ocr_service = OCRExtractionService()
 
 
 @router.post("/extract", response_model=ExtractionResponse)
-async def extract_document_ocr(file: UploadFile = File(...)):
+async def extract_document_ocr(
+    file: UploadFile = File(...),
+    x_profile: Optional[str] = Header(None),
+    x_request_id: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None)
+):
     """
     Extract information from an uploaded insurance document using OCR.
 
     Uses Tesseract OCR to extract text from documents and parse
     insurance-related fields.
 
+    Send `X-Profile: true` with a valid `X-Admin-Token` to capture a CPU
+    profile of this request; requests are also sampled at
+    PROFILE_SAMPLE_RATE. Captured profiles are listed at /admin/profiles.
+
     Supported formats: PDF, PNG, JPG, JPEG
     Note: Word and Excel files are not fully supported in v2 OCR mode.
     """
@@ -44,7 +56,39 @@ async def extract_document_ocr(file: UploadFile = File(...)):
             detail="Empty file uploaded"
         )
 
-    # Process extraction with OCR
+    # Only admins may force profiling, so clients can't fill PROFILE_DIR
+    requested = (
+        (x_profile or "").lower() in ("1", "true", "yes")
+        and is_admin_token(x_admin_token)
+    )
+    if not profiler.should_profile(requested):
+        return await _run_extraction(file, content)
+
+    # Profile this request and save the capture even if extraction fails
+    metadata = {
+        "filename": file.filename,
+        "content_type": file.content_type,
+        "size_bytes": len(content),
+    }
+    result = None
+    capture = ProfileCapture()
+    try:
+        with capture:
+            result = await _run_extraction(file, content)
+    finally:
+        if result is not None:
+            metadata["document_type"] = result.document_type
+        # A profiling problem must never change the response
+        try:
+            profiler.save(capture, x_request_id or uuid.uuid4().hex, metadata)
+        except Exception as e:
+            print(f"Profile save error: {type(e).__name__}: {e}")
+
+    return result
+
+
+async def _run_extraction(file: UploadFile, content: bytes) -> ExtractionResponse:
+    """Process extraction with OCR."""
     try:
         result = await ocr_service.extract(file.filename, content, file.content_type)
     except Exception as e:
@@ -79,3 +123,22 @@ async def extract_documents_ocr(files: List[UploadFile] = File(...)):
         )
 
     return results
+
+
+@router.post("/documents/{document_id}/reextract", response_model=ExtractionResponse)
+async def reextract_document(document_id: str):
+    """
+    Re-run classification and field parsing on a previously OCR'd document.
+
+    Uses the stored per-page OCR text with the current parsing rules,
+    so no OCR is performed.
+    """
+    result = await ocr_service.reextract(document_id)
+
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Document not found: {document_id}"
+        )
+
+    return result
@@ -1,14 +1,60 @@
 import io
 import os
 import re
+from collections import Counter
 from datetime import datetime
-from typing import List, Literal, Optional
+from typing import List, Literal, Optional, Tuple
 
 import pytesseract
 from PIL import Image
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
 
 from app.models.extraction import ExtractionResponse, ExtractedField
+from app.services.ocr_text_store import OCRTextStore
+from app.services.profiling import timed_call
+
+# Field labels, shared by the field parsers and two-pass key-page selection.
+# Anchors are the specific part of a label; the parsers also accept generic
+# words like "total" or "insured" that are too common to mark a key page.
+_POLICY_NUMBER_ANCHOR = r'policy\s*(?:number|no|#)'
+_POLICY_NUMBER_LABEL = rf'(?:{_POLICY_NUMBER_ANCHOR}|policy)'
+_POLICY_HOLDER_LABEL = r'(?:policy\s*holder|insured|named\s*insured)'
+_PREMIUM_ANCHOR = r'premium'
+_PREMIUM_LABEL = rf'(?:{_PREMIUM_ANCHOR}|total)'
+_CLAIM_NUMBER_ANCHOR = r'claim\s*(?:number|no|#)'
+_CLAIM_NUMBER_LABEL = rf'(?:{_CLAIM_NUMBER_ANCHOR}|claim)'
+_DATE_OF_LOSS_LABEL = r'(?:date\s*of\s*loss|loss\s*date|incident\s*date)'
+_CLAIMANT_LABEL = r'(?:claimant|insured)'
+_CLAIM_AMOUNT_ANCHOR = r'claim\s*amount'
+_CLAIM_AMOUNT_LABEL = rf'(?:{_CLAIM_AMOUNT_ANCHOR}|amount|total)'
+_APPLICATION_ID_ANCHOR = r'(?:application|submission|quote)\s*(?:id|number|no|#)'
+_APPLICATION_ID_LABEL = rf'(?:{_APPLICATION_ID_ANCHOR}|application|submission|quote)'
+_APPLICANT_LABEL = r'(?:applicant|proposed\s*insured|name)'
+_COVERAGE_LABEL = r'(?:coverage|type)'
+
+_DATE_PATTERN = r'\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}'
+
+# Value shapes a key-page anchor must be followed by. Like the parsers, the
+# separator is "[:\s]*", since triage OCR often drops the colon.
+_KEY_ID_VALUE = r'[A-Z\-]*\d'
+_KEY_AMOUNT_VALUE = r'\$?\d'
+
+# Name and free-text fields have no distinctive value shape, so they aren't
+# used to pick pages; they are usually on the first page or next to an anchor.
+_KEY_FIELD_ANCHORS = {
+    "policy": [
+        (_POLICY_NUMBER_ANCHOR, _KEY_ID_VALUE),
+        (_PREMIUM_ANCHOR, _KEY_AMOUNT_VALUE),
+    ],
+    "claim": [
+        (_CLAIM_NUMBER_ANCHOR, _KEY_ID_VALUE),
+        (_DATE_OF_LOSS_LABEL, _DATE_PATTERN),
+        (_CLAIM_AMOUNT_ANCHOR, _KEY_AMOUNT_VALUE),
+    ],
+    "submission": [
+        (_APPLICATION_ID_ANCHOR, _KEY_ID_VALUE),
+    ],
+}
 
 
 class OCRExtractionService:
@@ -17,10 +63,24 @@ class OCRExtractionService:
     Extracts text from images and PDFs, then parses insurance-related fields.
     """
 
+    # A page is a key page if it has a labelled field value ("Policy No AB-123")
+    _KEY_PAGE_PATTERNS = {
+        document_type: re.compile(
+            "|".join(rf'{anchor}(?!\w)[:\s]*{value}\S*' for anchor, value in anchors),
+            re.IGNORECASE
+        )
+        for document_type, anchors in _KEY_FIELD_ANCHORS.items()
+    }
+
     def __init__(
         self,
         tesseract_cmd: Optional[str] = None,
-        poppler_path: Optional[str] = None
+        poppler_path: Optional[str] = None,
+        text_store: Optional[OCRTextStore] = None,
+        two_pass: Optional[bool] = None,
+        full_dpi: Optional[int] = None,
+        triage_dpi: Optional[int] = None,
+        triage_min_pages: Optional[int] = None
     ):
         """
         Initialize the OCR service.
@@ -30,12 +90,30 @@ class OCRExtractionService:
                            If None, checks TESSERACT_CMD env var, then system default.
             poppler_path: Path to poppler bin directory (required for PDF on Windows).
                           If None, checks POPPLER_PATH env var.
+            text_store: Store for raw OCR text, used for re-extraction.
+                        If None, a store configured from OCR_TEXT_STORE_DIR is used.
+            two_pass: Triage PDF pages at low DPI and only OCR key pages at full DPI.
+                      If None, checks OCR_TWO_PASS env var, then disabled.
+            full_dpi: DPI for full-resolution OCR.
+                      If None, checks OCR_FULL_DPI env var, then 200.
+            triage_dpi: DPI for the low-resolution triage pass.
+                        If None, checks OCR_TRIAGE_DPI env var, then 100.
+            triage_min_pages: Minimum page count before the triage pass is used.
+                              If None, checks OCR_TRIAGE_MIN_PAGES env var, then 4.
         """
         tesseract_cmd = tesseract_cmd or os.getenv("TESSERACT_CMD")
         if tesseract_cmd:
             pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
 
         self.poppler_path = poppler_path or os.getenv("POPPLER_PATH")
+        self.text_store = text_store or OCRTextStore()
+
+        if two_pass is None:
+            two_pass = os.getenv("OCR_TWO_PASS", "").lower() in ("1", "true", "yes")
+        self.two_pass = two_pass
+        self.full_dpi = full_dpi or int(os.getenv("OCR_FULL_DPI") or 200)
+        self.triage_dpi = triage_dpi or int(os.getenv("OCR_TRIAGE_DPI") or 100)
+        self.triage_min_pages = triage_min_pages or int(os.getenv("OCR_TRIAGE_MIN_PAGES") or 4)
 
     async def extract(
         self,
@@ -45,19 +123,68 @@ class OCRExtractionService:
     ) -> ExtractionResponse:
         """Extract information from a document using OCR."""
 
-        # Extract text from document
-        extracted_text = await self._extract_text(content, content_type)
+        # Extract text from document, one entry per page
+        pages, triage_pages, document_type = await self._extract_text(
+            content, content_type, filename
+        )
+
+        # Keep the raw text so fields can be re-parsed later without OCR.
+        # This is best-effort: a store failure must not discard the OCR result.
+        try:
+            document_id = self.text_store.save(filename, content_type, pages, triage_pages)
+        except OSError as e:
+            print(f"OCR text store error: {type(e).__name__}: {e}")
+            document_id = None
+
+        return self._parse_text(filename, pages, triage_pages, document_id, document_type)
+
+    async def reextract(self, document_id: str) -> Optional[ExtractionResponse]:
+        """Re-parse a stored document with the current rules, without OCR."""
+        return self.reextract_stored(document_id)
+
+    def reextract_stored(self, document_id: str) -> Optional[ExtractionResponse]:
+        """Synchronous re-extraction, usable from worker processes."""
+        document = self.text_store.load(document_id)
+        if document is None:
+            return None
+
+        return self._parse_text(
+            document.filename, document.pages, document.triage_pages, document_id
+        )
+
+    def _parse_text(
+        self,
+        filename: str,
+        pages: List[str],
+        triage_pages: List[int],
+        document_id: Optional[str] = None,
+        document_type: Optional[str] = None
+    ) -> ExtractionResponse:
+        """
+        Classify the document and parse its fields from OCR text.
+
+        All pages are used for classification. Fields are parsed from
+        full-resolution pages, plus any triage-only pages that the current
+        key-page rules select; other triage text is skipped, since it could
+        win the first match over a correctly OCR'd value.
+        """
 
-        # Detect document type from content
-        document_type = self._detect_document_type(extracted_text, filename)
+        # Detect document type from content, unless triage already did
+        if document_type is None:
+            document_type = self._detect_document_type("\n".join(pages), filename)
 
         # Extract fields based on document type
-        extracted_fields = self._extract_fields(extracted_text, document_type)
+        skipped = set(triage_pages) - set(self._select_key_pages(pages, document_type))
+        field_text = "\n".join(
+            text for index, text in enumerate(pages) if index not in skipped
+        )
+        extracted_fields = self._extract_fields(field_text, document_type)
 
         # Calculate confidence based on field extraction success
         confidence = self._calculate_confidence(extracted_fields)
 
         return ExtractionResponse(
+            document_id=document_id,
             filename=filename,
             document_type=document_type,
             confidence=confidence,
@@ -65,35 +192,156 @@ class OCRExtractionService:
             processed_at=datetime.utcnow()
         )
 
-    async def _extract_text(self, content: bytes, content_type: str) -> str:
-        """Extract text from document using OCR."""
+    async def _extract_text(
+        self,
+        content: bytes,
+        content_type: str,
+        filename: str
+    ) -> Tuple[List[str], List[int], Optional[str]]:
+        """
+        Extract text from document using OCR.
+
+        Returns the text of each page, the indexes of pages that only have
+        low-resolution triage text, and the document type if triage found it.
+        """
 
         if content_type == "application/pdf":
-            return self._extract_text_from_pdf(content)
+            return self._extract_text_from_pdf(content, filename)
         elif content_type in ["image/png", "image/jpeg", "image/jpg"]:
-            return self._extract_text_from_image(content)
+            return [self._extract_text_from_image(content)], [], None
         else:
             # For Word/Excel, return empty for now (would need additional libraries)
-            return ""
+            return [], [], None
 
     def _extract_text_from_image(self, content: bytes) -> str:
         """Extract text from an image using pytesseract."""
         image = Image.open(io.BytesIO(content))
-        text = pytesseract.image_to_string(image)
+        text = timed_call("pytesseract.image_to_string", pytesseract.image_to_string, image)
         return text
 
-    def _extract_text_from_pdf(self, content: bytes) -> str:
+    def _extract_text_from_pdf(
+        self,
+        content: bytes,
+        filename: str
+    ) -> Tuple[List[str], List[int], Optional[str]]:
         """Extract text from a PDF by converting pages to images."""
         try:
-            images = convert_from_bytes(content, poppler_path=self.poppler_path)
-            text_parts = []
-            for image in images:
-                text = pytesseract.image_to_string(image)
-                text_parts.append(text)
-            return "\n".join(text_parts)
+            if self.two_pass and self._count_pdf_pages(content) >= self.triage_min_pages:
+                return self._extract_text_from_pdf_two_pass(content, filename)
+
+            return self._ocr_pdf_pages(content), [], None
         except Exception as e:
             print(f"PDF extraction error: {type(e).__name__}: {e}")
-            return ""
+            return [], [], None
+
+    def _ocr_pdf_pages(self, content: bytes) -> List[str]:
+        """OCR every page of a PDF at full DPI."""
+        images = timed_call(
+            "convert_from_bytes", convert_from_bytes,
+            content, dpi=self.full_dpi, poppler_path=self.poppler_path
+        )
+        text_parts = []
+        for image in images:
+            text = timed_call("pytesseract.image_to_string", pytesseract.image_to_string, image)
+            text_parts.append(text)
+        return text_parts
+
+    def _extract_text_from_pdf_two_pass(
+        self,
+        content: bytes,
+        filename: str
+    ) -> Tuple[List[str], List[int], Optional[str]]:
+        """
+        Extract text from a PDF in two passes.
+
+        Every page is first rasterized and OCR'd at low DPI to classify the
+        document and find the pages holding key fields. Only those pages are
+        then rasterized and OCR'd again at full DPI; the remaining pages keep
+        their triage text and are returned as triage pages.
+
+        If triage can't classify the document, every page gets one full-DPI
+        pass, so such documents cost the triage pass on top of single-pass OCR.
+        """
+        # Pass 1: cheap triage of every page
+        images = timed_call(
+            "convert_from_bytes (triage)", convert_from_bytes,
+            content, dpi=self.triage_dpi, grayscale=True, poppler_path=self.poppler_path
+        )
+        pages = [
+            timed_call("pytesseract.image_to_string (triage)", pytesseract.image_to_string, image)
+            for image in images
+        ]
+
+        # Classify once, with the filename, and reuse the type for parsing
+        document_type = self._detect_document_type("\n".join(pages), filename)
+        if document_type == "unknown":
+            return self._ocr_pdf_pages(content), [], None
+
+        # Pass 2: full-resolution OCR of key pages only
+        key_pages = self._select_key_pages(pages, document_type)
+        for first, last in self._page_ranges(key_pages):
+            images = timed_call(
+                "convert_from_bytes", convert_from_bytes,
+                content, dpi=self.full_dpi, first_page=first + 1, last_page=last + 1,
+                poppler_path=self.poppler_path
+            )
+            for offset, image in enumerate(images):
+                pages[first + offset] = timed_call(
+                    "pytesseract.image_to_string", pytesseract.image_to_string, image
+                )
+
+        key = set(key_pages)
+        triage_pages = [index for index in range(len(pages)) if index not in key]
+        return pages, triage_pages, document_type
+
+    def _count_pdf_pages(self, content: bytes) -> int:
+        """Read the page count from PDF metadata without rasterizing."""
+        info = timed_call(
+            "pdfinfo_from_bytes", pdfinfo_from_bytes,
+            content, poppler_path=self.poppler_path
+        )
+        return int(info["Pages"])
+
+    def _select_key_pages(self, pages: List[str], document_type: str) -> List[int]:
+        """Pick the pages holding key fields for the given document type."""
+        if not pages:
+            return []
+
+        pattern = self._KEY_PAGE_PATTERNS.get(document_type)
+        if pattern is None:
+            # Can't tell which pages matter, so treat all of them as key pages
+            return list(range(len(pages)))
+
+        page_matches = [
+            {" ".join(match.group(0).lower().split()) for match in pattern.finditer(text)}
+            for text in pages
+        ]
+
+        # A field repeated on most pages is a running header, not a key field
+        counts = Counter(match for matches in page_matches for match in matches)
+        header = {
+            match for match, count in counts.items()
+            if len(pages) >= 3 and count > len(pages) / 2
+        }
+
+        key_pages = [i for i, matches in enumerate(page_matches) if matches - header]
+
+        # The first page usually carries the header fields, even if triage missed them
+        if 0 not in key_pages:
+            key_pages.insert(0, 0)
+
+        return key_pages
+
+    @staticmethod
+    def _page_ranges(page_indexes: List[int]) -> List[Tuple[int, int]]:
+        """Group sorted page indexes into inclusive runs of consecutive pages."""
+        ranges = []
+        for index in page_indexes:
+            if ranges and index == ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], index)
+            else:
+                ranges.append((index, index))
+        return ranges
 
     def _detect_document_type(
         self,
@@ -180,7 +428,7 @@ class OCRExtractionService:
 
         # Policy Number patterns
         policy_match = re.search(
-            r'policy\s*(?:number|no|#)?[:\s]*([A-Z0-9\-]+)',
+            _POLICY_NUMBER_LABEL + r'[:\s]*([A-Z0-9\-]+)',
             text, re.IGNORECASE
         )
         if policy_match:
@@ -192,7 +440,7 @@ class OCRExtractionService:
 
         # Policyholder name
         holder_match = re.search(
-            r'(?:policy\s*holder|insured|named\s*insured)[:\s]*([A-Za-z\s]+)',
+            _POLICY_HOLDER_LABEL + r'[:\s]*([A-Za-z\s]+)',
             text, re.IGNORECASE
         )
         if holder_match:
@@ -203,8 +451,7 @@ class OCRExtractionService:
             ))
 
         # Dates (effective/expiration)
-        date_pattern = r'\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}'
-        dates = re.findall(date_pattern, text)
+        dates = re.findall(_DATE_PATTERN, text)
         if len(dates) >= 1:
             fields.append(ExtractedField(
                 field_name="Effective Date",
@@ -220,7 +467,7 @@ class OCRExtractionService:
 
         # Premium amount
         premium_match = re.search(
-            r'(?:premium|total)[:\s]*\$?([\d,]+\.?\d*)',
+            _PREMIUM_LABEL + r'[:\s]*\$?([\d,]+\.?\d*)',
             text, re.IGNORECASE
         )
         if premium_match:
@@ -238,7 +485,7 @@ class OCRExtractionService:
 
         # Claim Number
         claim_match = re.search(
-            r'claim\s*(?:number|no|#)?[:\s]*([A-Z0-9\-]+)',
+            _CLAIM_NUMBER_LABEL + r'[:\s]*([A-Z0-9\-]+)',
             text, re.IGNORECASE
         )
         if claim_match:
@@ -250,7 +497,7 @@ class OCRExtractionService:
 
         # Date of Loss
         dol_match = re.search(
-            r'(?:date\s*of\s*loss|loss\s*date|incident\s*date)[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4})',
+            _DATE_OF_LOSS_LABEL + r'[:\s]*(' + _DATE_PATTERN + ')',
             text, re.IGNORECASE
         )
         if dol_match:
@@ -262,7 +509,7 @@ class OCRExtractionService:
 
         # Claimant Name
         claimant_match = re.search(
-            r'(?:claimant|insured)[:\s]*([A-Za-z\s]+)',
+            _CLAIMANT_LABEL + r'[:\s]*([A-Za-z\s]+)',
             text, re.IGNORECASE
         )
         if claimant_match:
@@ -274,7 +521,7 @@ class OCRExtractionService:
 
         # Claim Amount
         amount_match = re.search(
-            r'(?:claim\s*amount|amount|total)[:\s]*\$?([\d,]+\.?\d*)',
+            _CLAIM_AMOUNT_LABEL + r'[:\s]*\$?([\d,]+\.?\d*)',
             text, re.IGNORECASE
         )
         if amount_match:
@@ -292,7 +539,7 @@ class OCRExtractionService:
 
         # Application ID
         app_match = re.search(
-            r'(?:application|submission|quote)\s*(?:id|number|no|#)?[:\s]*([A-Z0-9\-]+)',
+            _APPLICATION_ID_LABEL + r'[:\s]*([A-Z0-9\-]+)',
             text, re.IGNORECASE
         )
         if app_match:
@@ -304,7 +551,7 @@ class OCRExtractionService:
 
         # Applicant Name
         applicant_match = re.search(
-            r'(?:applicant|proposed\s*insured|name)[:\s]*([A-Za-z\s]+)',
+            _APPLICANT_LABEL + r'[:\s]*([A-Za-z\s]+)',
             text, re.IGNORECASE
         )
         if applicant_match:
@@ -315,8 +562,7 @@ class OCRExtractionService:
             ))
 
         # Application Date
-        date_pattern = r'\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}'
-        dates = re.findall(date_pattern, text)
+        dates = re.findall(_DATE_PATTERN, text)
         if dates:
             fields.append(ExtractedField(
                 field_name="Application Date",
@@ -326,7 +572,7 @@ class OCRExtractionService:
 
         # Coverage type
         coverage_match = re.search(
-            r'(?:coverage|type)[:\s]*([A-Za-z\s]+)',
+            _COVERAGE_LABEL + r'[:\s]*([A-Za-z\s]+)',
             text, re.IGNORECASE
         )
         if coverage_match:
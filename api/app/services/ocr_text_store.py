@@ -0,0 +1,95 @@
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from pydantic import BaseModel
+
+
+class StoredDocument(BaseModel):
+    document_id: str
+    filename: str
+    content_type: str
+    pages: List[str]
+    # Indexes of pages holding only low-resolution triage text (two-pass OCR)
+    triage_pages: List[int] = []
+    stored_at: datetime
+
+
+class OCRTextStore:
+    """
+    File-based store for raw OCR output.
+    Keeps the per-page text of each document so fields can be re-parsed
+    with updated rules without running Tesseract again.
+    """
+
+    def __init__(self, root_dir: Optional[str] = None):
+        """
+        Initialize the text store.
+
+        Args:
+            root_dir: Directory where OCR text is written.
+                      If None, checks OCR_TEXT_STORE_DIR env var, then "data/ocr_text".
+        """
+        self.root_dir = root_dir or os.getenv("OCR_TEXT_STORE_DIR") or "data/ocr_text"
+
+    def save(
+        self,
+        filename: str,
+        content_type: str,
+        pages: List[str],
+        triage_pages: Optional[List[int]] = None
+    ) -> str:
+        """Store the OCR pages of a document and return its document id."""
+        document = StoredDocument(
+            document_id=uuid.uuid4().hex,
+            filename=filename,
+            content_type=content_type,
+            pages=pages,
+            triage_pages=triage_pages or [],
+            stored_at=datetime.utcnow()
+        )
+
+        path = self._path(document.document_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial document
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(document.model_dump_json())
+        os.replace(tmp_path, path)
+
+        return document.document_id
+
+    def load(self, document_id: str) -> Optional[StoredDocument]:
+        """Load a stored document, or None if the id is unknown."""
+        if not self._is_valid_id(document_id):
+            return None
+
+        try:
+            with open(self._path(document_id), encoding="utf-8") as f:
+                return StoredDocument.model_validate(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def iter_ids(self) -> Iterator[str]:
+        """Yield the ids of all stored documents."""
+        if not os.path.isdir(self.root_dir):
+            return
+
+        for shard in os.scandir(self.root_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    yield entry.name[:-len(".json")]
+
+    def _path(self, document_id: str) -> str:
+        """Shard documents by id prefix to keep directories small."""
+        return os.path.join(self.root_dir, document_id[:2], f"{document_id}.json")
+
+    @staticmethod
+    def _is_valid_id(document_id: str) -> bool:
+        """Only accept ids we generated, so they can't escape root_dir."""
+        return len(document_id) == 32 and all(c in "0123456789abcdef" for c in document_id)
@@ -0,0 +1,179 @@
+import cProfile
+import os
+import random
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from pydantic import ValidationError
+
+from app.models.profiling import ProfiledCall, ProfileSummary
+
+T = TypeVar("T")
+
+_active_capture: ContextVar[Optional["ProfileCapture"]] = ContextVar(
+    "active_profile_capture", default=None
+)
+
+
+def timed_call(name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call func, recording its duration if a profile capture is active.
+    When profiling is off this is a single context variable lookup.
+    """
+    capture = _active_capture.get()
+    if capture is None:
+        return func(*args, **kwargs)
+
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        capture.calls.append(ProfiledCall(
+            name=name,
+            duration_ms=round((time.perf_counter() - start) * 1000, 2)
+        ))
+
+
+class ProfileCapture:
+    """
+    Captures a CPU profile and per-call timings for a single request.
+    Use as a context manager around the work to be profiled.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.calls: List[ProfiledCall] = []
+        self.captured_at = datetime.utcnow()
+        self.duration_ms = 0.0
+        self._start = 0.0
+        self._token = None
+
+    def __enter__(self) -> "ProfileCapture":
+        self.profiler.enable()
+        self._token = _active_capture.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.profiler.disable()
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 2)
+        _active_capture.reset(self._token)
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and stores the captured profiles.
+    Each profile is written as a .prof file (loadable with pstats or
+    snakeviz) plus a .json summary with timings and document metadata.
+    File names start with the capture time, so sorting by name orders
+    profiles by age without stat-ing every file.
+    """
+
+    def __init__(
+        self,
+        profile_dir: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        max_profiles: Optional[int] = None
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            profile_dir: Directory where profiles are written.
+                         If None, checks PROFILE_DIR env var, then "data/profiles".
+            sample_rate: Fraction of requests to profile without the header (0.0-1.0).
+                         If None, checks PROFILE_SAMPLE_RATE env var, then 0.0.
+            max_profiles: Number of most recent profiles to keep; older ones are deleted.
+                          If None, checks PROFILE_MAX_COUNT env var, then 100.
+        """
+        self.profile_dir = profile_dir or os.getenv("PROFILE_DIR") or "data/profiles"
+        if sample_rate is None:
+            sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE") or 0.0)
+        self.sample_rate = sample_rate
+        self.max_profiles = max_profiles or int(os.getenv("PROFILE_MAX_COUNT") or 100)
+
+    def should_profile(self, requested: bool) -> bool:
+        """Profile if the client asked for it, or if this request is sampled."""
+        if requested:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def save(
+        self,
+        capture: ProfileCapture,
+        request_id: str,
+        metadata: Dict[str, Any]
+    ) -> ProfileSummary:
+        """Write a captured profile and its summary, then prune old profiles."""
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+        # Request ids can come from a client header, so keep them path-safe,
+        # and add a timestamp and random suffix so repeated ids never collide
+        safe_id = re.sub(r"[^A-Za-z0-9_\-]", "_", request_id)[:64]
+        stem = (
+            f"{capture.captured_at.strftime('%Y%m%dT%H%M%S%f')}"
+            f"_{safe_id}_{uuid.uuid4().hex[:8]}"
+        )
+        profile_file = f"{stem}.prof"
+        capture.profiler.dump_stats(os.path.join(self.profile_dir, profile_file))
+
+        summary = ProfileSummary(
+            request_id=request_id,
+            captured_at=capture.captured_at,
+            duration_ms=capture.duration_ms,
+            metadata=metadata,
+            calls=capture.calls,
+            profile_file=profile_file
+        )
+        # Write to a temp file first so listings never see a partial summary
+        summary_path = os.path.join(self.profile_dir, f"{stem}.json")
+        tmp_path = f"{summary_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(summary.model_dump_json())
+        os.replace(tmp_path, summary_path)
+
+        self._prune()
+        return summary
+
+    def list_recent(self, limit: int = 20) -> List[ProfileSummary]:
+        """
+        Return the most recently saved profile summaries, newest first.
+        Summaries pruned or left unreadable by another worker are skipped.
+        """
+        summaries = []
+        for stem in reversed(self._list_stems()):
+            if len(summaries) >= limit:
+                break
+            try:
+                with open(os.path.join(self.profile_dir, f"{stem}.json"), encoding="utf-8") as f:
+                    summaries.append(ProfileSummary.model_validate_json(f.read()))
+            except (OSError, ValidationError):
+                continue
+        return summaries
+
+    def _list_stems(self) -> List[str]:
+        """Return saved profile names, oldest first."""
+        if not os.path.isdir(self.profile_dir):
+            return []
+
+        return sorted(
+            name[:-len(".json")] for name in os.listdir(self.profile_dir)
+            if name.endswith(".json")
+        )
+
+    def _prune(self) -> None:
+        """Delete the oldest profiles beyond max_profiles."""
+        stems = self._list_stems()
+        for stem in stems[:max(len(stems) - self.max_profiles, 0)]:
+            for extension in (".json", ".prof"):
+                try:
+                    os.remove(os.path.join(self.profile_dir, f"{stem}{extension}"))
+                except FileNotFoundError:
+                    pass
+
+
+profiler = RequestProfiler()
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+
+from app.services import ocr_extraction_service
+from app.services.ocr_extraction_service import OCRExtractionService
+from app.services.ocr_text_store import OCRTextStore
+from app.services.profiling import ProfileCapture
+
+FULL_DPI = 200
+TRIAGE_DPI = 100
+
+FILLER = "General conditions apply to this document."
+
+CLAIM_FORM = [
+    "Declarations\nPolicy Number: POL-1\nPremium: $1,200",
+    "Claim Number: CLM-9\nDate of Loss: 3/4/2024\nClaimant: Jane Doe\nClaim Amount: $5,000",
+    FILLER,
+    FILLER,
+    FILLER,
+    FILLER,
+]
+
+
+class FakePdf:
+    """Fakes poppler and tesseract for a PDF whose pages OCR to known text."""
+
+    def __init__(self, pages, triage_pages=None):
+        self.pages = pages
+        self.triage_pages = triage_pages or pages
+        self.conversions = []
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(ocr_extraction_service, "convert_from_bytes", self.convert_from_bytes)
+        monkeypatch.setattr(ocr_extraction_service, "pdfinfo_from_bytes", self.pdfinfo_from_bytes)
+        monkeypatch.setattr(ocr_extraction_service.pytesseract, "image_to_string", self.image_to_string)
+
+    def pdfinfo_from_bytes(self, content, poppler_path=None):
+        return {"Pages": len(self.pages)}
+
+    def convert_from_bytes(self, content, dpi=200, first_page=None, last_page=None, **kwargs):
+        first = first_page or 1
+        last = last_page or len(self.pages)
+        self.conversions.append((dpi, first, last))
+        return [(dpi, index) for index in range(first - 1, last)]
+
+    def image_to_string(self, image):
+        dpi, index = image
+        return self.triage_pages[index] if dpi == TRIAGE_DPI else self.pages[index]
+
+
+def _service(tmp_path, two_pass):
+    return OCRExtractionService(
+        text_store=OCRTextStore(str(tmp_path)),
+        two_pass=two_pass,
+        full_dpi=FULL_DPI,
+        triage_dpi=TRIAGE_DPI,
+        triage_min_pages=4
+    )
+
+
+def _extract(service, filename):
+    return asyncio.run(service.extract(filename, b"%PDF", "application/pdf"))
+
+
+@pytest.mark.parametrize("indexes, expected", [
+    ([], []),
+    ([3], [(3, 3)]),
+    ([0, 1, 2, 5, 7, 8], [(0, 2), (5, 5), (7, 8)]),
+])
+def test_page_ranges(indexes, expected):
+    assert OCRExtractionService._page_ranges(indexes) == expected
+
+
+def test_select_key_pages_tolerates_missing_colon(tmp_path):
+    service = _service(tmp_path, two_pass=True)
+    pages = ["Cover letter", FILLER, "Claim Number CLM-9", FILLER]
+
+    assert service._select_key_pages(pages, "claim") == [0, 2]
+
+
+def test_select_key_pages_ignores_generic_labels(tmp_path):
+    service = _service(tmp_path, two_pass=True)
+    pages = ["Cover letter", "Insured: John Smith", "Total: $1,200", "Name: Jane  Type: Auto"]
+
+    assert service._select_key_pages(pages, "policy") == [0]
+    assert service._select_key_pages(pages, "submission") == [0]
+
+
+def test_select_key_pages_ignores_running_header(tmp_path):
+    service = _service(tmp_path, two_pass=True)
+    header = "Insured: John Smith  Premium: $1,200  Policy No: POL-1\n"
+    pages = [header + FILLER] * 6
+    pages[3] = header + "Premium: $1,350 (adjusted)"
+
+    assert service._select_key_pages(pages, "policy") == [0, 3]
+
+
+def test_select_key_pages_unknown_type_selects_all(tmp_path):
+    service = _service(tmp_path, two_pass=True)
+
+    assert service._select_key_pages([FILLER] * 3, "unknown") == [0, 1, 2]
+
+
+def test_two_pass_classifies_with_filename(tmp_path, monkeypatch):
+    FakePdf(CLAIM_FORM).install(monkeypatch)
+
+    single = _extract(_service(tmp_path, two_pass=False), "claim_form.pdf")
+    two_pass = _extract(_service(tmp_path, two_pass=True), "claim_form.pdf")
+
+    assert single.document_type == "claim"
+    assert two_pass.document_type == "claim"
+    assert [f.field_name for f in single.extracted_fields] == [
+        "Claim Number", "Date of Loss", "Claimant Name", "Claim Amount"
+    ]
+    assert two_pass.extracted_fields == single.extracted_fields
+    assert two_pass.confidence == single.confidence
+
+
+def test_two_pass_only_ocrs_key_pages_at_full_dpi(tmp_path, monkeypatch):
+    pdf = FakePdf(CLAIM_FORM)
+    pdf.install(monkeypatch)
+
+    _extract(_service(tmp_path, two_pass=True), "claim_form.pdf")
+
+    assert pdf.conversions == [(TRIAGE_DPI, 1, 6), (FULL_DPI, 1, 2)]
+
+
+def test_triage_text_is_not_parsed(tmp_path, monkeypatch):
+    # The triage-only "Total" page comes first, so it would win the first match
+    pages = [CLAIM_FORM[0], "Total 9,999", CLAIM_FORM[1], FILLER, FILLER]
+    triage = [page.replace("5,000", "5,O00") for page in pages]
+    FakePdf(pages, triage).install(monkeypatch)
+
+    result = _extract(_service(tmp_path, two_pass=True), "claim_form.pdf")
+
+    amounts = [f.value for f in result.extracted_fields if f.field_name == "Claim Amount"]
+    assert amounts == ["$5,000"]
+
+
+def test_unknown_document_gets_one_full_dpi_pass(tmp_path, monkeypatch):
+    pdf = FakePdf([FILLER] * 5)
+    pdf.install(monkeypatch)
+
+    result = _extract(_service(tmp_path, two_pass=True), "scan.pdf")
+
+    assert result.document_type == "unknown"
+    assert pdf.conversions == [(TRIAGE_DPI, 1, 5), (FULL_DPI, 1, 5)]
+    assert OCRTextStore(str(tmp_path)).load(result.document_id).triage_pages == []
+
+
+def test_reextract_reselects_triage_pages_with_current_rules(tmp_path):
+    service = _service(tmp_path, two_pass=True)
+    pages = ["Cover letter", FILLER, "Claim Number CLM-9", FILLER]
+    document_id = service.text_store.save("claim.pdf", "application/pdf", pages, [1, 2, 3])
+
+    result = service.reextract_stored(document_id)
+
+    assert [f.value for f in result.extracted_fields if f.field_name == "Claim Number"] == ["CLM-9"]
+
+
+def test_page_count_is_profiled(tmp_path, monkeypatch):
+    FakePdf(CLAIM_FORM).install(monkeypatch)
+
+    with ProfileCapture() as capture:
+        _extract(_service(tmp_path, two_pass=True), "claim_form.pdf")
+
+    assert capture.calls[0].name == "pdfinfo_from_bytes"
@@ -0,0 +1,54 @@
+import os
+
+from app.services.ocr_text_store import OCRTextStore
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = OCRTextStore(str(tmp_path))
+
+    document_id = store.save("policy.pdf", "application/pdf", ["page one", "page two"], [1])
+    document = store.load(document_id)
+
+    assert document.document_id == document_id
+    assert document.filename == "policy.pdf"
+    assert document.content_type == "application/pdf"
+    assert document.pages == ["page one", "page two"]
+    assert document.triage_pages == [1]
+
+
+def test_save_shards_by_id_prefix(tmp_path):
+    store = OCRTextStore(str(tmp_path))
+
+    document_id = store.save("policy.pdf", "application/pdf", ["text"])
+
+    assert os.path.isfile(tmp_path / document_id[:2] / f"{document_id}.json")
+    assert not [name for name in os.listdir(tmp_path / document_id[:2]) if name.endswith(".tmp")]
+
+
+def test_load_unknown_id_returns_none(tmp_path):
+    store = OCRTextStore(str(tmp_path))
+
+    assert store.load("0" * 32) is None
+
+
+def test_load_rejects_ids_outside_store(tmp_path):
+    store = OCRTextStore(str(tmp_path / "store"))
+    (tmp_path / "secret.json").write_text("{}")
+
+    assert store.load("../secret") is None
+    assert store.load("ABCDEF" + "0" * 26) is None
+    assert store.load("0" * 31) is None
+
+
+def test_iter_ids_lists_documents_across_shards(tmp_path):
+    store = OCRTextStore(str(tmp_path))
+    document_ids = {store.save(f"doc{i}.pdf", "application/pdf", ["text"]) for i in range(20)}
+    (tmp_path / "stray-file.txt").write_text("ignored")
+
+    assert set(store.iter_ids()) == document_ids
+
+
+def test_iter_ids_on_missing_dir_is_empty(tmp_path):
+    store = OCRTextStore(str(tmp_path / "missing"))
+
+    assert list(store.iter_ids()) == []
@@ -0,0 +1,54 @@
+import os
+
+from app.services.profiling import ProfileCapture, RequestProfiler, timed_call
+
+
+def _save(profiler, request_id, **metadata):
+    with ProfileCapture() as capture:
+        timed_call("sum", sum, range(10))
+    return profiler.save(capture, request_id, metadata)
+
+
+def test_timed_call_records_only_inside_capture():
+    assert timed_call("sum", sum, [1, 2]) == 3
+
+    with ProfileCapture() as capture:
+        timed_call("sum", sum, [1, 2])
+
+    assert [call.name for call in capture.calls] == ["sum"]
+
+
+def test_repeated_request_ids_do_not_overwrite(tmp_path):
+    profiler = RequestProfiler(profile_dir=str(tmp_path))
+
+    _save(profiler, "same-id", index=0)
+    _save(profiler, "same-id", index=1)
+
+    assert len(profiler.list_recent()) == 2
+
+
+def test_save_prunes_oldest_profiles(tmp_path):
+    profiler = RequestProfiler(profile_dir=str(tmp_path), max_profiles=3)
+
+    for index in range(5):
+        _save(profiler, "request", index=index)
+
+    assert [s.metadata["index"] for s in profiler.list_recent(10)] == [4, 3, 2]
+    assert len(os.listdir(tmp_path)) == 6
+
+
+def test_list_recent_skips_unreadable_summaries(tmp_path):
+    profiler = RequestProfiler(profile_dir=str(tmp_path))
+    _save(profiler, "good", index=0)
+    (tmp_path / "99999999T999999999999_partial_00000000.json").write_text('{"request_id": "par')
+
+    assert [s.request_id for s in profiler.list_recent()] == ["good"]
+
+
+def test_request_id_is_made_path_safe(tmp_path):
+    profiler = RequestProfiler(profile_dir=str(tmp_path / "profiles"))
+
+    summary = _save(profiler, "../../etc/passwd")
+
+    assert os.path.dirname(summary.profile_file) == ""
+    assert os.path.isfile(tmp_path / "profiles" / summary.profile_file)
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from app.reextract import main
+from app.services.ocr_text_store import OCRTextStore
+
+CLAIM_TEXT = "Claim Number: CLM-9\nDate of Loss: 3/4/2024\nClaimant: Jane Doe\nClaim Amount: $5,000"
+
+
+def _run(tmp_path, *args):
+    output = tmp_path / "results.jsonl"
+    exit_code = main([
+        "--store-dir", str(tmp_path / "store"),
+        "--workers", "1",
+        "--output", str(output),
+        *args
+    ])
+    lines = output.read_text().splitlines()
+    return exit_code, [json.loads(line) for line in lines]
+
+
+def test_requires_all_or_ids(tmp_path):
+    with pytest.raises(SystemExit):
+        main(["--store-dir", str(tmp_path)])
+
+
+def test_rejects_all_with_ids(tmp_path):
+    with pytest.raises(SystemExit):
+        main(["--store-dir", str(tmp_path), "--all", "0" * 32])
+
+
+def test_all_reextracts_every_document(tmp_path):
+    store = OCRTextStore(str(tmp_path / "store"))
+    document_ids = {store.save("claim.pdf", "application/pdf", [CLAIM_TEXT]) for _ in range(3)}
+
+    exit_code, results = _run(tmp_path, "--all")
+
+    assert exit_code == 0
+    assert {result["document_id"] for result in results} == document_ids
+    assert all(result["document_type"] == "claim" for result in results)
+
+
+def test_missing_ids_are_reported(tmp_path, capsys):
+    store = OCRTextStore(str(tmp_path / "store"))
+    document_id = store.save("claim.pdf", "application/pdf", [CLAIM_TEXT])
+
+    exit_code, results = _run(tmp_path, document_id, "f" * 32)
+
+    assert exit_code == 1
+    assert [result["document_id"] for result in results] == [document_id]
+    assert "1 not found, 0 failed" in capsys.readouterr().err
+
+
+def test_corrupt_document_does_not_abort_backfill(tmp_path, capsys):
+    store = OCRTextStore(str(tmp_path / "store"))
+    document_ids = [store.save("claim.pdf", "application/pdf", [CLAIM_TEXT]) for _ in range(3)]
+    corrupt_path = tmp_path / "store" / document_ids[1][:2] / f"{document_ids[1]}.json"
+    corrupt_path.write_text('{"document_id": "trunc')
+
+    exit_code, results = _run(tmp_path, "--all")
+
+    assert exit_code == 1
+    assert {result["document_id"] for result in results} == {document_ids[0], document_ids[2]}
+    err = capsys.readouterr().err
+    assert f"Document failed: {document_ids[1]}" in err
+    assert "0 not found, 1 failed" in err